@@ -1,14 +1,59 @@
 #!/usr/bin/env python3
-import json
+import atexit
+import functools
+import hashlib
 import logging
 import os
+import queue
 import sys
+import time
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
-from flask import Flask, request, send_file
+from logging.handlers import QueueHandler, QueueListener
+from flask import Flask, Response, request
+
+try:
+    import orjson
+
+    def dump_json(obj):
+        """Serialize obj to UTF-8 JSON bytes using orjson's C encoder"""
+        return orjson.dumps(obj)
+
+    def dump_json_line(obj):
+        """Serialize obj to a newline-terminated JSON line, appended by orjson itself"""
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+
+    def load_json(body):
+        """Parse JSON bytes using orjson's C parser (raises ValueError)"""
+        return orjson.loads(body)
+except ImportError:
+    import json
+
+    def dump_json(obj):
+        """Serialize obj to UTF-8 JSON bytes (stdlib fallback when orjson is missing)"""
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    def dump_json_line(obj):
+        """Serialize obj to a newline-terminated JSON line (stdlib fallback)"""
+        return dump_json(obj) + b'\n'
+
+    def load_json(body):
+        """Parse JSON bytes (stdlib fallback, raises ValueError)"""
+        return json.loads(body)
 
 app = Flask(__name__)
 
+def _parse_size(size_str):
+    """Convert a size string (e.g. 10MB, 512KB, 1GB) to bytes"""
+    size_str = size_str.strip().upper()
+    if size_str.endswith('MB'):
+        return int(size_str[:-2]) * 1024 * 1024
+    elif size_str.endswith('KB'):
+        return int(size_str[:-2]) * 1024
+    elif size_str.endswith('GB'):
+        return int(size_str[:-2]) * 1024 * 1024 * 1024
+    else:
+        return int(size_str)
+
 # Environment variable configuration
 PORT = int(os.getenv('PORT', 5353))
 HOST = os.getenv('HOST', '0.0.0.0')
@@ -18,6 +63,257 @@ LOG_FORMAT = os.getenv('LOG_FORMAT', 'detailed')  # detailed, simple, json
 LOG_ROTATION = os.getenv('LOG_ROTATION', 'true').lower() == 'true'
 MAX_LOG_SIZE = os.getenv('MAX_LOG_SIZE', '10MB')
 BACKUP_COUNT = int(os.getenv('BACKUP_COUNT', 5))
+MAX_LOG_BYTES = _parse_size(MAX_LOG_SIZE)
+_DEBUG = LOG_LEVEL == 'DEBUG'  # fixed at startup, so hot paths test a constant
+
+def _first(data, keys, default):
+    """Return the value of the first key in keys that is set in data"""
+    for key in keys:
+        value = data.get(key)
+        if value is not None:
+            return value
+    return default
+
+def _extract(data):
+    """Pull the LoggiFly fields out of a parsed webhook payload
+
+    Returns (container, keyword, message, timestamp, title). timestamp and
+    title are None when absent; only the JSON format needs their defaults.
+    """
+    container = data.get('container', 'unknown')
+    keyword_raw = _first(data, ('keyword', 'keywords'), 'unknown')
+    
+    # Handle keyword arrays (LoggiFly sometimes sends arrays)
+    if isinstance(keyword_raw, list):
+        keyword = ', '.join(str(k) for k in keyword_raw)
+    else:
+        keyword = str(keyword_raw)
+    
+    # The same few container/keyword labels repeat across thousands of webhooks
+    if isinstance(container, str):
+        container = sys.intern(container)
+    keyword = sys.intern(keyword)
+    
+    message = _first(data, ('message', 'body'), 'No message')
+    return container, keyword, message, data.get('timestamp'), data.get('title')
+
+def _fmt_json(container, keyword, message, timestamp, title, data):
+    """JSON entry carrying the full LoggiFly metadata"""
+    if timestamp is None:
+        # Only read the clock when LoggiFly did not send a timestamp
+        timestamp = datetime.now().isoformat(timespec='milliseconds')
+    if title is None:
+        title = f"LoggiFly: '{keyword}' in {container}"
+    return dump_json_line({
+        'timestamp': timestamp,
+        'container': container,
+        'keyword': keyword,
+        'title': title,
+        'message': message,
+        'version': data.get('version', '1.0'),
+        'type': data.get('type', 'info')
+    })
+
+_asctime_cache = (None, '')
+
+def _asctime():
+    """Current local time in logging's default asctime format"""
+    global _asctime_cache
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _asctime_cache
+    if second != cached_second:
+        # strftime only runs once per second; milliseconds are appended per call
+        prefix = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))
+        _asctime_cache = (second, prefix)
+    return f"{prefix},{int((now - second) * 1000):03d}"
+
+@functools.lru_cache(maxsize=1024)
+def _simple_prefix(container, keyword):
+    return f"[{container}] {keyword}: "
+
+@functools.lru_cache(maxsize=1024)
+def _detailed_prefix(container, keyword):
+    return f"{container} | {keyword} | "
+
+def _fmt_simple(container, keyword, message, timestamp, title, data):
+    """Simple entry: asctime - [container] keyword: message"""
+    return f"{_asctime()} - {_simple_prefix(str(container), keyword)}{message}\n".encode('utf-8')
+
+def _fmt_detailed(container, keyword, message, timestamp, title, data):
+    """Detailed entry: asctime - container | keyword | message"""
+    return f"{_asctime()} - {_detailed_prefix(str(container), keyword)}{message}\n".encode('utf-8')
+
+def _make_formatter(log_format):
+    """Resolve LOG_FORMAT once to its entry formatter
+
+    Every formatter returns a complete UTF-8 line, newline included, which
+    the notifications handlers write without further formatting.
+    """
+    if log_format == 'json':
+        return _fmt_json
+    if log_format == 'simple':
+        return _fmt_simple
+    return _fmt_detailed  # detailed (default)
+
+# Format selection is fixed for the process lifetime, so resolve it at import
+FORMAT_ENTRY = _make_formatter(LOG_FORMAT)
+
+class FDHandler(logging.Handler):
+    """Size-rotated log handler that appends bytes to a raw fd with os.write.
+
+    Skips FileHandler's TextIOWrapper and BufferedWriter layers: each entry is
+    encoded once and appended through an O_APPEND descriptor. Rotation names
+    backups like RotatingFileHandler (file.1 ... file.N), and as there, no
+    rollover happens unless both maxBytes and backupCount are set.
+    The file size is tracked in memory and only re-read with fstat() every
+    rollover_check_records records, since rollover accuracy can be coarse.
+    """
+
+    terminator = b'\n'
+
+    def __init__(self, filename, maxBytes=0, backupCount=0, rollover_check_records=256):
+        super().__init__()
+        self.baseFilename = os.path.abspath(filename)
+        self.maxBytes = maxBytes
+        self.backupCount = backupCount
+        self.rollover_check_records = rollover_check_records
+        self._fd = self._open()
+        self._size = os.fstat(self._fd).st_size
+        self._unchecked = 0  # records written since the size was last read
+
+    def _open(self):
+        return os.open(self.baseFilename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _encode(self, record):
+        """Bytes messages are complete lines and are written as-is"""
+        if isinstance(record.msg, bytes):
+            return record.msg
+        return self.format(record).encode('utf-8') + self.terminator
+
+    def emit(self, record):
+        # Handler.handle() already holds self.lock here
+        try:
+            self._write(self._encode(record), 1)
+        except Exception:
+            self.handleError(record)
+
+    def _write(self, data, records):
+        """Append data holding the given number of records (caller holds the lock)"""
+        if self._fd is None:
+            # Closed, or a previous rollover failed part way; never reuse a stale fd
+            self._fd = self._open()
+            self._size = os.fstat(self._fd).st_size
+            self._unchecked = 0
+        if self.maxBytes > 0 and self.backupCount > 0:
+            self._unchecked += records
+            if self._unchecked >= self.rollover_check_records:
+                self._size = os.fstat(self._fd).st_size
+                self._unchecked = 0
+            if self._size and self._size + len(data) >= self.maxBytes:
+                self.doRollover()
+        written = os.write(self._fd, data)
+        while written < len(data):
+            written += os.write(self._fd, data[written:])
+        self._size += written
+
+    def doRollover(self):
+        """Shift file.N-1 -> file.N ... file -> file.1 and reopen (caller holds the lock)"""
+        os.close(self._fd)
+        self._fd = None
+        for i in range(self.backupCount - 1, 0, -1):
+            source = f"{self.baseFilename}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.baseFilename}.{i + 1}")
+        if os.path.exists(self.baseFilename):
+            os.replace(self.baseFilename, f"{self.baseFilename}.1")
+        self._fd = self._open()
+        self._size = 0
+        self._unchecked = 0
+
+    def close(self):
+        self.acquire()
+        try:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+        finally:
+            self.release()
+        super().close()
+
+class BufferedRotatingHandler(FDHandler):
+    """FDHandler that coalesces records into one write per flush.
+
+    Records are buffered until flush_bytes have accumulated or flush() is
+    called, which BatchingQueueListener does whenever its queue runs dry.
+    Rollover is checked once per flushed batch rather than per record.
+    """
+
+    def __init__(self, filename, flush_bytes=64 * 1024, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.flush_bytes = flush_bytes
+        self._buffer = bytearray()
+        self._buffered_records = 0
+        self._last_record = None  # reported by handleError if a batch write fails
+
+    def emit(self, record):
+        # Handler.handle() already holds self.lock here
+        try:
+            self._buffer += self._encode(record)
+            self._buffered_records += 1
+            self._last_record = record
+            if len(self._buffer) >= self.flush_bytes:
+                self._write_buffer()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.acquire()
+        try:
+            self._write_buffer()
+        except Exception:
+            # Keep the listener thread alive; the failed batch is dropped
+            self.handleError(self._last_record)
+        finally:
+            self.release()
+
+    def _write_buffer(self):
+        """Write out all buffered records in a single call (caller holds the lock)"""
+        if not self._buffer:
+            return
+        try:
+            self._write(self._buffer, self._buffered_records)
+        finally:
+            self._buffer.clear()
+            self._buffered_records = 0
+
+    def close(self):
+        self.flush()
+        super().close()
+
+class BatchingQueueListener(QueueListener):
+    """QueueListener that flushes its handlers each time the queue drains.
+
+    A burst of notifications is emitted into the handlers' buffers and then
+    written out together, so the write batch grows with the load instead of
+    waiting on a timer.
+    """
+
+    def dequeue(self, block):
+        if block and self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+        return self.queue.get(block)
+
+class NotificationQueueHandler(QueueHandler):
+    """QueueHandler for entries that FORMAT_ENTRY has already fully formatted.
+
+    Notification records carry no args or exc_info, so the format-and-copy
+    step QueueHandler.prepare() would run on the request thread is skipped.
+    """
+
+    def prepare(self, record):
+        return record
 
 def setup_logging():
     """Configure logging - notifications to file, internal to console only"""
@@ -27,20 +323,6 @@ def setup_logging():
     if notifications_dir:
         os.makedirs(notifications_dir, exist_ok=True)
     
-    # Convert size string to bytes
-    def parse_size(size_str):
-        size_str = size_str.strip().upper()
-        if size_str.endswith('MB'):
-            return int(size_str[:-2]) * 1024 * 1024
-        elif size_str.endswith('KB'):
-            return int(size_str[:-2]) * 1024
-        elif size_str.endswith('GB'):
-            return int(size_str[:-2]) * 1024 * 1024 * 1024
-        else:
-            return int(size_str)
-    
-    max_bytes = parse_size(MAX_LOG_SIZE)
-    
     # Console handler for internal logs (Docker logs only)
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
@@ -53,33 +335,34 @@ def setup_logging():
     )
     
     # Suppress Flask HTTP logs unless in DEBUG mode
-    if LOG_LEVEL != 'DEBUG':
+    if not _DEBUG:
         werkzeug_logger = logging.getLogger('werkzeug')
         werkzeug_logger.setLevel(logging.WARNING)
     
     # Create separate logger for notifications (file only, with rotation)
     notifications_logger = logging.getLogger('notifications')
     
-    # Configure notifications log format
-    if LOG_FORMAT == 'json':
-        notifications_format = '%(message)s'  # Just the JSON message
-    elif LOG_FORMAT == 'simple':
-        notifications_format = '%(asctime)s - %(message)s'  # Keep timestamp for simple
-    else:  # detailed
-        notifications_format = '%(asctime)s - %(message)s'  # Logger timestamp + our format
-    
-    # Setup notifications log handler (with rotation, file only)
+    # Setup notifications log handler (with rotation and batched writes, file only)
     if LOG_ROTATION:
-        notifications_handler = RotatingFileHandler(
+        notifications_handler = BufferedRotatingHandler(
             NOTIFICATIONS_LOG, 
-            maxBytes=max_bytes, 
+            maxBytes=MAX_LOG_BYTES, 
             backupCount=BACKUP_COUNT
         )
     else:
-        notifications_handler = logging.FileHandler(NOTIFICATIONS_LOG)
+        notifications_handler = FDHandler(NOTIFICATIONS_LOG)
     
-    notifications_handler.setFormatter(logging.Formatter(notifications_format))
-    notifications_logger.addHandler(notifications_handler)
+    # Request threads only enqueue records; a background listener does the file I/O
+    notifications_queue = queue.SimpleQueue()
+    notifications_listener = BatchingQueueListener(
+        notifications_queue,
+        notifications_handler,
+        respect_handler_level=True
+    )
+    notifications_listener.start()
+    atexit.register(notifications_listener.stop)
+    
+    notifications_logger.addHandler(NotificationQueueHandler(notifications_queue))
     notifications_logger.setLevel(logging.INFO)
     
     # Prevent notifications from going to root logger (no console output)
@@ -89,57 +372,84 @@ def setup_logging():
 
 logger, notifications_logger = setup_logging()
 
+# Startup summary at import so it reaches docker logs under Gunicorn as well
+logger.info(f"Starting LoggiFly Helper on {HOST}:{PORT}")
+logger.info(f"Notifications log: {NOTIFICATIONS_LOG}")
+logger.info(f"Log format: {LOG_FORMAT}, level: {LOG_LEVEL}")
+logger.info(f"Log rotation: enabled={LOG_ROTATION}, max_size={MAX_LOG_SIZE}, backups={BACKUP_COUNT}")
+logger.info(f"Flask debug mode: {_DEBUG}")
+logger.info("Ready to log ALL notifications from LoggiFly")
+
+def log_notification(entry):
+    """Write a formatted entry to the notifications log
+
+    Builds the LogRecord directly so Logger.info()'s findCaller() stack walk
+    is skipped; the caller location is never part of the output.
+    """
+    notifications_logger.handle(notifications_logger.makeRecord(
+        notifications_logger.name, logging.INFO, '', 0, entry, None, None
+    ))
+
+# The icon never changes at runtime, so read it and derive its ETag once
+ICON_PATH = '/app/icon.png'
+try:
+    with open(ICON_PATH, 'rb') as icon_file:
+        _ICON = icon_file.read()
+    _ICON_ETAG = hashlib.md5(_ICON, usedforsecurity=False).hexdigest()
+    _ICON_HEADERS = {'ETag': f'"{_ICON_ETAG}"', 'Cache-Control': 'public, max-age=86400'}
+    _ICON_ERROR = None
+except OSError as e:
+    _ICON = _ICON_ETAG = _ICON_HEADERS = None
+    _ICON_ERROR = str(e)
+
+# /health and /config bodies only depend on startup configuration
+_HEALTHY_BODY = dump_json({
+    'status': 'healthy',
+    'notifications_log': NOTIFICATIONS_LOG,
+    'log_level': LOG_LEVEL,
+    'version': '1.1'
+})
+_CONFIG_BODY = dump_json({
+    'port': PORT,
+    'host': HOST,
+    'log_level': LOG_LEVEL,
+    'notifications_log': NOTIFICATIONS_LOG,
+    'log_format': LOG_FORMAT,
+    'log_rotation': LOG_ROTATION,
+    'max_log_size': MAX_LOG_SIZE,
+    'backup_count': BACKUP_COUNT
+})
+
 @app.route('/webhook', methods=['POST'])
 def webhook():
     """Handle LoggiFly webhook notifications"""
     try:
-        # Get request data
-        content_type = request.headers.get('Content-Type', '')
-        
-        if 'application/json' in content_type:
-            data = request.get_json(silent=True) or {}
+        # Get request data (Werkzeug parses the mimetype once, without parameters)
+        if request.mimetype == 'application/json':
+            # Parse the raw body directly; skips Flask's stdlib parse and body cache
+            body = request.get_data(cache=False)
+            try:
+                data = load_json(body) or {}
+            except ValueError:  # mirror get_json(silent=True)
+                data = {}
         else:
             # Handle plain text or other formats
-            raw_data = request.data.decode('utf-8', errors='ignore')
-            data = {'message': raw_data}
+            body = request.data
+            data = {'message': body.decode('utf-8', errors='ignore')}
         
         # Extract LoggiFly data with defaults
-        container = data.get('container', 'unknown')
-        keyword_raw = data.get('keyword', data.get('keywords', 'unknown'))
+        container, keyword, message, timestamp, title = _extract(data)
         
-        # Handle keyword arrays (LoggiFly sometimes sends arrays)
-        if isinstance(keyword_raw, list):
-            keyword = ', '.join(str(k) for k in keyword_raw)
-        else:
-            keyword = str(keyword_raw)
-            
-        # Get message and title from LoggiFly payload
-        title = data.get('title', f"LoggiFly: '{keyword}' in {container}")
-        message = data.get('message', data.get('body', 'No message'))
-        timestamp = data.get('timestamp', datetime.now().isoformat())
-        
-        # Format log entry based on LOG_FORMAT
-        if LOG_FORMAT == 'json':
-            log_entry = json.dumps({
-                'timestamp': timestamp,
-                'container': container,
-                'keyword': keyword,
-                'title': title,
-                'message': message,
-                'version': data.get('version', '1.0'),
-                'type': data.get('type', 'info')
-            })
-        elif LOG_FORMAT == 'simple':
-            log_entry = f"[{container}] {keyword}: {message}"
-        else:  # detailed (default) - clean, readable format
-            log_entry = f"{container} | {keyword} | {message}"
+        # Format log entry using the formatter resolved from LOG_FORMAT
+        log_entry = FORMAT_ENTRY(container, keyword, message, timestamp, title, data)
         
         # Log to notifications file only (no console spam)
-        notifications_logger.info(log_entry)
+        log_notification(log_entry)
         
-        # Debug log full payload to internal logs if debug level
-        if logger.isEnabledFor(logging.DEBUG):
-            logger.debug(f"Full webhook payload: {json.dumps(data, indent=2)}")
+        # Debug log full payload to internal logs if debug level, as received
+        # rather than re-encoding the parsed dict
+        if _DEBUG:
+            logger.debug(f"Full webhook payload: {body.decode('utf-8', errors='replace')}")
         
         return {'status': 'success', 'message': 'Notification logged'}, 200
         
@@ -155,12 +465,7 @@ def health():
         # Basic health check - verify notifications log file is writable
         with open(NOTIFICATIONS_LOG, 'a'):
             pass
-        return {
-            'status': 'healthy',
-            'notifications_log': NOTIFICATIONS_LOG,
-            'log_level': LOG_LEVEL,
-            'version': '1.1'
-        }, 200
+        return Response(_HEALTHY_BODY, mimetype='application/json')
     except Exception as e:
         logger.error(f"Health check failed: {e}", exc_info=True)
         return {
@@ -171,34 +476,30 @@ def health():
 @app.route('/config', methods=['GET'])
 def config():
     """Show current configuration"""
-    return {
-        'port': PORT,
-        'host': HOST,
-        'log_level': LOG_LEVEL,
-        'notifications_log': NOTIFICATIONS_LOG,
-        'log_format': LOG_FORMAT,
-        'log_rotation': LOG_ROTATION,
-        'max_log_size': MAX_LOG_SIZE,
-        'backup_count': BACKUP_COUNT
-    }, 200
+    return Response(_CONFIG_BODY, mimetype='application/json')
 
 @app.route('/stats', methods=['GET'])
 def stats():
     """Show log file statistics"""
     try:
-        import glob
-        
-        # Get notification log files
-        notifications_size = os.path.getsize(NOTIFICATIONS_LOG) if os.path.exists(NOTIFICATIONS_LOG) else 0
-        notifications_pattern = f"{NOTIFICATIONS_LOG}.*"
-        notifications_rotated = glob.glob(notifications_pattern)
+        # Get notification log files with a single directory scan (no glob)
+        notifications_dir, notifications_name = os.path.split(NOTIFICATIONS_LOG)
+        rotated_prefix = notifications_name + '.'
+        notifications_size = 0
+        notifications_rotated = 0
+        with os.scandir(notifications_dir or '.') as entries:
+            for entry in entries:
+                if entry.name == notifications_name:
+                    notifications_size = entry.stat().st_size
+                elif entry.name.startswith(rotated_prefix):
+                    notifications_rotated += 1
         
         return {
             'notifications_log': {
                 'file': NOTIFICATIONS_LOG,
                 'size': notifications_size,
-                'rotated_files': len(notifications_rotated),
-                'total_files': len(notifications_rotated) + (1 if notifications_size > 0 else 0)
+                'rotated_files': notifications_rotated,
+                'total_files': notifications_rotated + (1 if notifications_size > 0 else 0)
             }
         }, 200
     except Exception as e:
@@ -208,21 +509,13 @@ def stats():
 @app.route('/icon.png', methods=['GET'])
 def icon():
     """Serve the container icon for Unraid"""
-    try:
-        return send_file('/app/icon.png', mimetype='image/png')
-    except Exception as e:
-        logger.warning(f"Could not serve icon.png: {e}")
-        return {'status': 'error', 'message': str(e)}, 404
+    if _ICON is None:
+        logger.warning(f"Could not serve icon.png: {_ICON_ERROR}")
+        return {'status': 'error', 'message': _ICON_ERROR}, 404
+    if request.if_none_match.contains_weak(_ICON_ETAG):
+        return '', 304, _ICON_HEADERS
+    return Response(_ICON, mimetype='image/png', headers=_ICON_HEADERS)
 
 if __name__ == '__main__':
-    logger.info(f"Starting LoggiFly Helper on {HOST}:{PORT}")
-    logger.info(f"Notifications log: {NOTIFICATIONS_LOG}")
-    logger.info(f"Log format: {LOG_FORMAT}, level: {LOG_LEVEL}")
-    logger.info(f"Log rotation: enabled={LOG_ROTATION}, max_size={MAX_LOG_SIZE}, backups={BACKUP_COUNT}")
-    logger.info("Ready to log ALL notifications from LoggiFly")
-    
     # Set debug=True for Flask's reloader if LOG_LEVEL is DEBUG
-    flask_debug_mode = (LOG_LEVEL == 'DEBUG')
-    logger.info(f"Flask debug mode: {flask_debug_mode}")
-    
-    app.run(host=HOST, port=PORT, debug=flask_debug_mode)
\ No newline at end of file
+    app.run(host=HOST, port=PORT, debug=_DEBUG, threaded=True)
\ No newline at end of file
@@ -50,10 +50,5 @@ echo "  User: $PUID:$PGID"
 echo "Will log ALL notifications received from LoggiFly"
 
 # Start the application as the specified user
-if [ "${WORKERS:-1}" -gt 1 ]; then
-    echo "Starting with Gunicorn (${WORKERS} workers)..."
-    exec gosu $PUID:$PGID gunicorn --bind "${HOST:-0.0.0.0}:${PORT:-5353}" --workers "${WORKERS}" app:app
-else
-    echo "Starting with Flask development server..."
-    exec gosu $PUID:$PGID python /app/app.py
-fi
\ No newline at end of file
+echo "Starting with Gunicorn (${WORKERS:-1} workers, ${THREADS:-8} threads each)..."
+exec gosu $PUID:$PGID gunicorn -c /app/gunicorn_conf.py app:app
\ No newline at end of file
@@ -0,0 +1,14 @@
+"""Gunicorn configuration for LoggiFly Helper
+
+Run with: gunicorn -c gunicorn_conf.py app:app
+"""
+import os
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', 5353)}"
+
+# Threaded workers keep accepting webhooks while another request waits on log I/O.
+# Keep a single worker: each process rotates the log on its own, so more than
+# one splits records across rotated files. Scale with THREADS instead.
+worker_class = 'gthread'
+workers = int(os.getenv('WORKERS', 1))
+threads = int(os.getenv('THREADS', 8))
\ No newline at end of file